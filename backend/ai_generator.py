@@ -1,6 +1,12 @@
 import os
 import json
-from typing import Dict, Any, Optional
+import hashlib
+import re
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Any, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field, create_model
 
 # =============================================================================
 # 1. SYSTEM PROMPT
@@ -28,6 +34,9 @@ PITCH_DECK_SCHEMA = {
     "TAM_VALUE": "String with $ and B/M suffix (e.g. '$150B', '$50B'). Must include B for billions or M for millions.",
     "SAM_VALUE": "String with $ and B/M suffix (e.g. '$25B', '$10B'). Must include B for billions or M for millions.",
     "SOM_VALUE": "String with $ and M suffix (e.g. '$500M', '$100M'). Must include M for millions.",
+    "TAM_NUM": "Number in billions matching TAM_VALUE (e.g. 150 for '$150B')",
+    "SAM_NUM": "Number in billions matching SAM_VALUE (e.g. 25 for '$25B')",
+    "SOM_NUM": "Number in billions matching SOM_VALUE (e.g. 0.5 for '$500M')",
     "WHY_NOW_1": "String (max 8 words)",
     "WHY_NOW_2": "String (max 8 words)",
     "WHY_NOW_3": "String (max 8 words)",
@@ -48,6 +57,32 @@ PITCH_DECK_SCHEMA = {
     "VISION_STATEMENT": "String (max 12 words)"
 }
 
+# Numeric market keys in PITCH_DECK_SCHEMA, mapped to their market data names
+MARKET_NUM_KEYS = {"TAM_NUM": "TAM", "SAM_NUM": "SAM", "SOM_NUM": "SOM"}
+
+# Models: market sizing only returns three numbers, so it uses the cheapest tier
+METADATA_MODEL = "gemini-2.5-flash-lite"
+MARKET_DATA_MODEL = "gemini-2.0-flash-lite"
+
+# Realistic fallback when market sizing is unavailable (in billions)
+DEFAULT_MARKET_DATA = {"TAM": 150, "SAM": 25, "SOM": 0.5}
+
+# Structured output schemas enforced by Gemini (response_schema)
+PitchMetadata = create_model(
+    "PitchMetadata",
+    **{
+        key: (float if key in MARKET_NUM_KEYS else str, Field(description=description))
+        for key, description in PITCH_DECK_SCHEMA.items()
+    }
+)
+
+
+class MarketData(BaseModel):
+    TAM: float
+    SAM: float
+    SOM: float
+
+
 SYSTEM_PROMPT = f"""You are a specialized Pitch Deck Metadata Generator.
 Your ONLY job is to generate structured JSON data for a startup pitch deck based on a provided idea.
 
@@ -56,7 +91,7 @@ RULES:
 2. The output must be a single flat JSON object.
 3. Keys must EXACTLY match the provided schema.
 4. Do NOT include any keys not present in the schema.
-5. All values must be strings.
+5. All values must be strings, except TAM_NUM, SAM_NUM and SOM_NUM, which must be plain numbers in BILLIONS of dollars (no $, no 'B').
 6. Enforce concise, investor-style language:
    - Bullet points: MAX 8 words.
    - Vision statement: MAX 12 words.
@@ -92,16 +127,126 @@ ADDITIONAL CONSTRAINTS:
 # 3. GENERATION FUNCTION
 # =============================================================================
 
-def generate_pitch_metadata(idea: str, context: Dict[str, Any]) -> str:
+@lru_cache(maxsize=1)
+def _get_client():
+    """
+    Returns a shared Gemini client so its HTTP transport is reused across calls.
+    
+    The .env file is loaded here, once, rather than at import.
+    
+    Raises:
+        ValueError: If GEMINI_API_KEY is not set
+    """
+    from dotenv import load_dotenv
+    from google import genai
+    
+    load_dotenv()
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY not found in environment variables")
+    
+    return genai.Client(api_key=api_key)
+
+
+# Process-local cache of parsed LLM responses, keyed on a hash of model + prompts
+RESPONSE_CACHE_TTL = 86400  # seconds
+RESPONSE_CACHE_MAX_ENTRIES = 256
+_RESPONSE_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+# Matches a completed "KEY": "value" string pair in partially streamed JSON
+_STREAMED_FIELD_RE = re.compile(r'"([A-Z0-9_]+)"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+async def _generate_json(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    response_schema: Type[BaseModel],
+    on_field: Optional[Callable[[str, str], None]] = None,
+    **generation_config: Any
+) -> Dict[str, Any]:
+    """
+    Calls the LLM with schema-enforced JSON output, serving repeated prompts from cache.
+    
+    The response is streamed, so callers can start work on individual fields
+    before the whole object has been decoded.
+    
+    Args:
+        model: Gemini model name
+        system_prompt: Static instructions, sent as the system instruction
+        user_prompt: Per-request prompt text
+        response_schema: Pydantic model the response must conform to
+        on_field: Optional callback invoked with (key, value) as each string field arrives
+        **generation_config: Extra GenerateContentConfig options (e.g. max_output_tokens)
+        
+    Returns:
+        Parsed response as a dictionary (a fresh copy, safe for the caller to mutate)
+        
+    Raises:
+        ValueError: If the response does not match the schema
+    """
+    from google.genai import types
+    
+    key = hashlib.blake2b(
+        "\0".join((model, system_prompt, user_prompt)).encode(), digest_size=16
+    ).hexdigest()
+    
+    cached = _RESPONSE_CACHE.get(key)
+    if cached and cached[0] > time.monotonic():
+        if on_field:
+            for field, value in cached[1].items():
+                if isinstance(value, str):
+                    on_field(field, value)
+        return dict(cached[1])
+    
+    stream = await _get_client().aio.models.generate_content_stream(
+        model=model,
+        contents=user_prompt,
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=response_schema,
+            system_instruction=system_prompt,
+            **generation_config
+        )
+    )
+    
+    text = ""
+    scanned = 0
+    async for chunk in stream:
+        text += chunk.text or ""
+        if on_field:
+            # Report every field completed since the last chunk
+            for match in _STREAMED_FIELD_RE.finditer(text, scanned):
+                on_field(match.group(1), json.loads(match.group(2)))
+                scanned = match.end()
+    
+    result = response_schema.model_validate_json(text).model_dump()
+    
+    # Evict the oldest entry once the cache is full
+    if key not in _RESPONSE_CACHE and len(_RESPONSE_CACHE) >= RESPONSE_CACHE_MAX_ENTRIES:
+        _RESPONSE_CACHE.pop(next(iter(_RESPONSE_CACHE)))
+    _RESPONSE_CACHE[key] = (time.monotonic() + RESPONSE_CACHE_TTL, result)
+    
+    return dict(result)
+
+
+async def generate_pitch_metadata(
+    idea: str,
+    context: Dict[str, Any],
+    on_field: Optional[Callable[[str, str], None]] = None
+) -> Dict[str, Any]:
     """
     Calls an LLM API to generate pitch deck metadata.
     
     Args:
         idea: The core startup idea description.
         context: Dictionary containing 'customer', 'region', and optional 'constraints'.
+        on_field: Optional callback invoked with (key, value) as each text field streams in.
         
     Returns:
-        Raw text output from the LLM (expected to be JSON).
+        Parsed metadata dictionary validated against PITCH_DECK_SCHEMA, or {}
+        on API or schema errors.
     """
     
     # Construct the full user prompt
@@ -115,30 +260,16 @@ def generate_pitch_metadata(idea: str, context: Dict[str, Any]) -> str:
     # ------------------------------------------------------------------
     # ------------------------------------------------------------------
     # LLM API CALL
-    from google import genai
-    from dotenv import load_dotenv  
-    load_dotenv() 
-    
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY not found in environment variables")
-
-    client = genai.Client(api_key=api_key)
+    _get_client()  # Raises early if GEMINI_API_KEY is missing
 
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-lite",
-            contents=SYSTEM_PROMPT + "\n\n" + user_prompt
-        )
-        # Clean up response if it contains markdown code blocks
-        text = response.text.replace("```json", "").replace("```", "").strip()
-        return json.loads(text)
+        return await _generate_json(METADATA_MODEL, SYSTEM_PROMPT, user_prompt, PitchMetadata, on_field)
     except Exception as e:
         print(f"Error calling Gemini API: {e}")
         return {}
 
 
-def generate_market_data(idea: str, context: Dict[str, Any]) -> Dict[str, float]:
+async def generate_market_data(idea: str, context: Dict[str, Any]) -> Dict[str, float]:
     """
     Generates numeric market size data (TAM, SAM, SOM).
     
@@ -173,28 +304,55 @@ def generate_market_data(idea: str, context: Dict[str, Any]) -> Dict[str, float]
     Research the actual market and provide realistic numbers in billions.
     """
     
-    from google import genai
-    from dotenv import load_dotenv
-    load_dotenv()
-    
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        return {"TAM": 150, "SAM": 25, "SOM": 0.5}  # Realistic fallback
-        
-    client = genai.Client(api_key=api_key)
+    try:
+        _get_client()
+    except ValueError:
+        return dict(DEFAULT_MARKET_DATA)
     
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-lite",
-            contents=system_prompt + "\n\n" + user_prompt
+        # Three numbers never need more than a few dozen output tokens
+        return await _generate_json(
+            MARKET_DATA_MODEL, system_prompt, user_prompt, MarketData,
+            max_output_tokens=64,
+            temperature=0.2
         )
-        text = response.text.replace("```json", "").replace("```", "").strip()
-        return json.loads(text)
     except Exception as e:
         print(f"Error generating market data: {e}")
-        return {"TAM": 150, "SAM": 25, "SOM": 0.5}  # Realistic fallback
+        return dict(DEFAULT_MARKET_DATA)
+
+
+async def generate_all(
+    idea: str,
+    context: Dict[str, Any],
+    on_field: Optional[Callable[[str, str], None]] = None
+) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """
+    Generates pitch deck metadata and market data in a single LLM request.
+    
+    Args:
+        idea: Startup idea
+        context: Context dictionary
+        on_field: Optional callback invoked with (key, value) as each text field streams in
+        
+    Returns:
+        Tuple of (metadata dictionary, market data dictionary in billions)
+    """
+    metadata = await generate_pitch_metadata(idea, context, on_field)
+    
+    # Split the numeric market fields off the metadata
+    market_data = {}
+    for num_key, market_key in MARKET_NUM_KEYS.items():
+        try:
+            market_data[market_key] = float(metadata.pop(num_key))
+        except (KeyError, TypeError, ValueError):
+            market_data[market_key] = DEFAULT_MARKET_DATA[market_key]
+    
+    return metadata, market_data
+
 
 if __name__ == "__main__":
+    import asyncio
+
     # Simple test
     test_context = {
         "customer": "Remote Doctors",
@@ -202,9 +360,13 @@ if __name__ == "__main__":
         "constraints": "Focus on AI efficiency"
     }
     print("Testing Metadata Generation...")
-    meta = generate_pitch_metadata("Uber for Doctors", test_context)
+    meta = asyncio.run(generate_pitch_metadata("Uber for Doctors", test_context))
     print(json.dumps(meta, indent=2))
     
+    print("\nTesting Combined Generation...")
+    meta, market = asyncio.run(generate_all("Uber for Doctors", test_context))
+    print(json.dumps(market, indent=2))
+    
     print("\nTesting Market Data Generation...")
-    market = generate_market_data("Uber for Doctors", test_context)
+    market = asyncio.run(generate_market_data("Uber for Doctors", test_context))
     print(json.dumps(market, indent=2))
@@ -1,10 +1,12 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from pydantic import BaseModel
 from typing import Optional
+import hashlib
 import os
-from generate_ppt import generate_pitch_deck
+import time
+from generate_ppt import CACHE_DIR, generate_pitch_deck, get_env_variable
 
 app = FastAPI(
     title="PitchForge AI API",
@@ -18,44 +20,95 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Generated decks, keyed on a hash of the template ID and request payload
+DECK_CACHE_DIR = os.path.join(CACHE_DIR, "decks")
+DECK_CACHE_TTL = 86400  # seconds
+DECK_CACHE_MAX_ENTRIES = 256
+
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
 class PitchRequest(BaseModel):
     idea: str
     customer: str = "General"
     region: str = "Global"
     constraints: str = "None"
 
+def _prune_deck_cache():
+    """Delete expired decks, then the oldest ones beyond the cache size limit."""
+    try:
+        decks = sorted((entry.stat().st_mtime, entry.path) for entry in os.scandir(DECK_CACHE_DIR))
+    except OSError:
+        return
+    
+    expiry = time.time() - DECK_CACHE_TTL
+    excess = len(decks) - DECK_CACHE_MAX_ENTRIES
+    for i, (mtime, path) in enumerate(decks):
+        if i < excess or mtime < expiry:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
 @app.post("/generate", summary="Generate a pitch deck")
-async def generate_deck(request: PitchRequest, background_tasks: BackgroundTasks):
+async def generate_deck(
+    request: PitchRequest,
+    background_tasks: BackgroundTasks,
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Generate a pitch deck based on the provided startup idea and context.
     Returns the generated PPTX file.
+    
+    Identical payloads for the same template are served from the deck cache
+    for up to DECK_CACHE_TTL, and clients that send the returned ETag back in
+    If-None-Match get a 304 instead of the file.
     """
     try:
-        context = {
-            "customer": request.customer,
-            "region": request.region,
-            "constraints": request.constraints
-        }
+        template_id = get_env_variable("TEMPLATE_PRESENTATION_ID")
+        etag = hashlib.sha256(
+            f"{template_id}\0{request.model_dump_json()}".encode()
+        ).hexdigest()
+        quoted_etag = f'"{etag}"'
         
-        # Generate the deck
-        output_file = generate_pitch_deck(request.idea, context)
+        if if_none_match in (etag, quoted_etag):
+            return Response(status_code=304, headers={"ETag": quoted_etag})
         
-        if not os.path.exists(output_file):
-            raise HTTPException(status_code=500, detail="Failed to generate pitch deck file")
-            
-        # Schedule file cleanup after response is sent (optional, but good practice)
-        # background_tasks.add_task(os.remove, output_file)
+        cached_file = os.path.join(DECK_CACHE_DIR, f"{etag}.pptx")
         
-        filename = os.path.basename(output_file)
+        try:
+            is_cached = os.path.getmtime(cached_file) > time.time() - DECK_CACHE_TTL
+        except OSError:
+            is_cached = False
+        
+        if not is_cached:
+            context = {
+                "customer": request.customer,
+                "region": request.region,
+                "constraints": request.constraints
+            }
+            
+            # Generate the deck
+            output_file = await generate_pitch_deck(request.idea, context)
+            
+            if not os.path.exists(output_file):
+                raise HTTPException(status_code=500, detail="Failed to generate pitch deck file")
+            
+            os.makedirs(DECK_CACHE_DIR, exist_ok=True)
+            os.replace(output_file, cached_file)
+            _prune_deck_cache()
         
         return FileResponse(
-            path=output_file,
-            filename=filename,
-            media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation"
+            path=cached_file,
+            filename=f"pitch_deck_{etag[:12]}.pptx",
+            media_type=PPTX_MEDIA_TYPE,
+            headers={"ETag": quoted_etag}
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3,20 +3,20 @@ PitchForge AI - Automated Pitch Deck Generator
 Generates customized pitch decks using Google Slides API and environment-based configuration.
 """
 
+import argparse
+import asyncio
+import json
 import os
-import pickle
+import re
+import threading
 import time
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Awaitable, Dict, Any, List, Optional, Set, Tuple
 
-from dotenv import load_dotenv
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from ai_generator import MARKET_NUM_KEYS, PITCH_DECK_SCHEMA, generate_all
 
-from ai_generator import generate_pitch_metadata, generate_market_data
-
-# Load environment variables from .env file
-load_dotenv()
+# The Google client stack is imported inside the functions that use it, so
+# input and configuration errors surface without paying its import cost
 
 # Google API Scopes
 SCOPES = [
@@ -26,13 +26,84 @@ SCOPES = [
 ]
 
 # Token file for storing OAuth credentials
-TOKEN_FILE = "token.pickle"
+TOKEN_FILE = "token.json"
+
+# Text placeholder keys, shared by the AI schema and the .env configuration
+PLACEHOLDER_KEYS = tuple(key for key in PITCH_DECK_SCHEMA if key not in MARKET_NUM_KEYS)
+
+# Environment variables holding numeric market sizes for the chart (in billions)
+MARKET_ENV_KEYS = {"TAM": "TAM_NUMERIC", "SAM": "SAM_NUMERIC", "SOM": "SOM_NUMERIC"}
+
+# {{KEY}} token for each placeholder key, formatted once at import
+BRACED_KEYS = {key: f"{{{{{key}}}}}" for key in PLACEHOLDER_KEYS}
+
+# (braced token, environment variable) pairs used by load_placeholders
+_PLACEHOLDER_SPEC: Tuple[Tuple[str, str], ...] = tuple((BRACED_KEYS[key], key) for key in PLACEHOLDER_KEYS)
+
+# Matches {{KEY}} placeholders in slide text
+PLACEHOLDER_PATTERN = re.compile(r"\{\{[A-Z0-9_]+\}\}")
+
+# Retries for transient Google API errors (429, 5xx, connection resets); the
+# client library backs off exponentially with jitter between attempts
+API_NUM_RETRIES = 5
+
+# Chunk size for streaming exported files to disk
+EXPORT_CHUNK_SIZE = 1024 * 1024
+
+# Partial-response mask for the template scan: only the text, slide/chart IDs
+# and linked spreadsheet that get_template_info reads. Groups nested more than
+# two deep are fetched whole, so placeholders are found at any depth
+_TEXT_FIELDS = "text/textElements/textRun/content"
+_SHAPE_FIELDS = f"shape/{_TEXT_FIELDS},table/tableRows/tableCells/{_TEXT_FIELDS}"
+_GROUP_FIELDS = (
+    f"elementGroup/children({_SHAPE_FIELDS},"
+    f"elementGroup/children({_SHAPE_FIELDS},elementGroup))"
+)
+TEMPLATE_SCAN_FIELDS = (
+    f"slides(objectId,"
+    f"pageElements(objectId,sheetsChart/spreadsheetId,{_SHAPE_FIELDS},{_GROUP_FIELDS}),"
+    f"slideProperties/notesPage/pageElements({_SHAPE_FIELDS})),"
+    f"layouts/pageElements({_SHAPE_FIELDS},{_GROUP_FIELDS}),"
+    f"masters/pageElements({_SHAPE_FIELDS},{_GROUP_FIELDS})"
+)
+
+# Local cache directory for data that outlives a single process
+CACHE_DIR = os.path.join(".cache", "pitchforge")
+
+# Template scan results (placeholders and linked chart), keyed on template ID;
+# also persisted under CACHE_DIR, and rescanned when the template's Drive
+# version changes
+_TEMPLATE_INFO: Dict[str, Dict[str, Any]] = {}
+TEMPLATE_INFO_KEYS = ("version", "placeholders", "chart_object_ids", "sheet_id", "chart_tab_name")
+
+# Process-wide credentials and service clients, created on first use
+_CREDS = None
+_SERVICES = None
+_AUTH_LOCK = threading.Lock()
+
+# Per-thread authorized HTTP connections (httplib2 is not thread-safe)
+_THREAD_HTTP = threading.local()
 
+# Every copied deck's chart links to the template's sheet, so decks filled
+# concurrently must not interleave one sheet write with another's chart refresh
+_SHEET_LOCKS: Dict[str, asyncio.Lock] = {}
 
+
+@lru_cache(maxsize=None)
+def _load_env_once():
+    """Load environment variables from the .env file on first use."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+@lru_cache(maxsize=None)
 def get_env_variable(key: str, default: str = None) -> str:
     """
     Retrieve environment variable with error handling.
     
+    Environment variables are fixed once .env has been loaded, so lookups are
+    memoized; call get_env_variable.cache_clear() after changing os.environ.
+    
     Args:
         key: Environment variable name
         default: Default value if not found
@@ -43,74 +114,208 @@ def get_env_variable(key: str, default: str = None) -> str:
     Raises:
         ValueError: If required variable is missing and no default provided
     """
+    _load_env_once()
     value = os.getenv(key, default)
     if value is None:
         raise ValueError(f"Missing required environment variable: {key}")
     return value
 
 
+def load_placeholders() -> Dict[str, str]:
+    """
+    Load placeholder values from environment variables (see .env.example).
+    
+    Returns:
+        Dictionary mapping {{KEY}} to value
+        
+    Raises:
+        ValueError: If any placeholder variable is missing, listing all of them
+    """
+    _load_env_once()
+    env = os.environ
+    missing = [key for key in PLACEHOLDER_KEYS if key not in env]
+    if missing:
+        raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+    return {braced: env[name] for braced, name in _PLACEHOLDER_SPEC}
+
+
+def load_market_data() -> Dict[str, float]:
+    """
+    Load numeric market sizes (in billions) from environment variables.
+    
+    Returns:
+        Dictionary with TAM, SAM and SOM values
+        
+    Raises:
+        ValueError: If any market size variable is missing or not a number
+    """
+    _load_env_once()
+    env = os.environ
+    missing = [env_key for env_key in MARKET_ENV_KEYS.values() if env_key not in env]
+    if missing:
+        raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+    try:
+        return {key: float(env[env_key]) for key, env_key in MARKET_ENV_KEYS.items()}
+    except ValueError as e:
+        raise ValueError(f"Market size variables must be numbers: {e}")
+
+
+def _build_request(http, *args, **kwargs):
+    """
+    Request builder that gives each thread its own authorized connection,
+    so the shared service clients can be used from concurrent requests.
+    """
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.http import HttpRequest, build_http
+    
+    if getattr(_THREAD_HTTP, "creds", None) is not _CREDS:
+        # build_http keeps the library's socket timeout, so a stalled connection
+        # fails (and is retried) instead of hanging its worker thread
+        _THREAD_HTTP.http = AuthorizedHttp(_CREDS, http=build_http())
+        _THREAD_HTTP.creds = _CREDS
+    return HttpRequest(_THREAD_HTTP.http, *args, **kwargs)
+
+
 def authenticate_google_services():
     """
     Authenticate with Google APIs using OAuth 2.0.
     
+    Credentials and service clients are cached for the life of the process;
+    the token file and OAuth flow are only touched on cold start or when the
+    cached credentials can no longer be refreshed in memory.
+    
     Returns:
         Tuple of (slides_service, drive_service, sheets_service)
     """
-    creds = None
-    oauth_creds_path = get_env_variable("OAUTH_CREDENTIALS_PATH", "oauth_credentials.json")
+    global _CREDS, _SERVICES
     
-    # Load existing credentials from token file
-    if os.path.exists(TOKEN_FILE):
-        with open(TOKEN_FILE, "rb") as token:
-            creds = pickle.load(token)
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
     
-    # Refresh or obtain new credentials if needed
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            print("Refreshing expired credentials...")
-            creds.refresh(Request())
-        else:
-            if not os.path.exists(oauth_creds_path):
-                raise FileNotFoundError(
-                    f"OAuth credentials file not found: {oauth_creds_path}\n"
-                    "Please download your OAuth credentials from Google Cloud Console."
+    with _AUTH_LOCK:
+        if _SERVICES is not None and _CREDS.valid:
+            return _SERVICES
+        
+        creds = _CREDS
+        oauth_creds_path = get_env_variable("OAUTH_CREDENTIALS_PATH", "oauth_credentials.json")
+        
+        # Load existing credentials from token file
+        if creds is None and os.path.exists(TOKEN_FILE):
+            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        
+        # Refresh or obtain new credentials if needed
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                print("Refreshing expired credentials...")
+                creds.refresh(Request())
+            else:
+                if not os.path.exists(oauth_creds_path):
+                    raise FileNotFoundError(
+                        f"OAuth credentials file not found: {oauth_creds_path}\n"
+                        "Please download your OAuth credentials from Google Cloud Console."
+                    )
+                print("Initiating OAuth flow...")
+                flow = InstalledAppFlow.from_client_secrets_file(oauth_creds_path, SCOPES)
+                creds = flow.run_local_server(port=0)
+            
+            # Save credentials for future use
+            with open(TOKEN_FILE, "w") as token:
+                token.write(creds.to_json())
+            print("Credentials saved successfully.")
+        
+        # Refreshing updates the credentials in place, so existing clients stay usable
+        if _SERVICES is None or creds is not _CREDS:
+            _CREDS = creds
+            
+            # Build service clients from the discovery documents bundled with
+            # the client library, so no discovery fetch goes over the network
+            _SERVICES = tuple(
+                build(
+                    api, version,
+                    credentials=creds,
+                    requestBuilder=_build_request,
+                    static_discovery=True,
+                    cache_discovery=False
                 )
-            print("Initiating OAuth flow...")
-            flow = InstalledAppFlow.from_client_secrets_file(oauth_creds_path, SCOPES)
-            creds = flow.run_local_server(port=0)
+                for api, version in [("slides", "v1"), ("drive", "v3"), ("sheets", "v4")]
+            )
         
-        # Save credentials for future use
-        with open(TOKEN_FILE, "wb") as token:
-            pickle.dump(creds, token)
-        print("Credentials saved successfully.")
-    
-    # Build service clients
-    slides_service = build("slides", "v1", credentials=creds)
-    drive_service = build("drive", "v3", credentials=creds)
-    sheets_service = build("sheets", "v4", credentials=creds)
+        return _SERVICES
+
+
+# Interactive prompt for each startup input field
+INPUT_PROMPTS = {
+    "idea": "What is your startup idea? ",
+    "customer": "Who is your target customer? ",
+    "region": "Target region (e.g., US, Global)? ",
+    "constraints": "Any specific constraints/focus? "
+}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parse command-line arguments.
     
-    return slides_service, drive_service, sheets_service
+    Args:
+        argv: Argument list (defaults to sys.argv)
+        
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="PitchForge AI - Pitch Deck Generator")
+    parser.add_argument(
+        "--mode",
+        choices=["ai", "env"],
+        default="ai",
+        help="Generate content with AI (default) or read it from environment variables"
+    )
+    parser.add_argument("--idea", help="Startup idea description")
+    parser.add_argument("--customer", help="Target customer")
+    parser.add_argument("--region", help="Target region (e.g., US, Global)")
+    parser.add_argument("--constraints", help="Specific constraints or focus")
+    parser.add_argument(
+        "--input-json",
+        help="JSON file with any of idea, customer, region and constraints"
+    )
+    return parser.parse_args(argv)
 
 
-def get_user_input() -> Dict[str, Any]:
+def get_user_input(args: Optional[argparse.Namespace] = None) -> Dict[str, Any]:
     """
-    Get startup idea and context from user input.
+    Get startup idea and context from the command line, a JSON file, or user input.
     
+    Values given on the command line override the JSON file; anything still
+    missing is asked for interactively.
+    
+    Args:
+        args: Parsed command-line arguments
+        
     Returns:
         Dictionary with idea and context
     """
-    print("\n📝 Tell us about your startup:")
-    idea = input("What is your startup idea? ").strip()
-    customer = input("Who is your target customer? ").strip()
-    region = input("Target region (e.g., US, Global)? ").strip()
-    constraints = input("Any specific constraints/focus? ").strip()
+    values = {}
+    if args is not None:
+        if args.input_json:
+            with open(args.input_json, "r") as f:
+                values.update({k: str(v) for k, v in json.load(f).items() if k in INPUT_PROMPTS})
+        for field in INPUT_PROMPTS:
+            if getattr(args, field) is not None:
+                values[field] = getattr(args, field)
+    
+    missing = [field for field in INPUT_PROMPTS if field not in values]
+    if missing:
+        print("\n📝 Tell us about your startup:")
+        for field in missing:
+            values[field] = input(INPUT_PROMPTS[field])
     
     return {
-        "idea": idea,
+        "idea": values["idea"].strip(),
         "context": {
-            "customer": customer,
-            "region": region,
-            "constraints": constraints
+            "customer": values["customer"].strip(),
+            "region": values["region"].strip(),
+            "constraints": values["constraints"].strip()
         }
     }
 
@@ -123,9 +328,9 @@ def prepare_placeholders(generated_data: Dict[str, str]) -> Dict[str, str]:
         generated_data: Raw dictionary from LLM
         
     Returns:
-        Dictionary mapping {{KEY}} to value
+        Dictionary mapping {{KEY}} to value (keys without a placeholder are dropped)
     """
-    return {f"{{{{{key}}}}}": value for key, value in generated_data.items()}
+    return {BRACED_KEYS[key]: value for key, value in generated_data.items() if key in BRACED_KEYS}
 
 
 def copy_template_presentation(drive_service, template_id: str, output_name: str) -> str:
@@ -144,90 +349,222 @@ def copy_template_presentation(drive_service, template_id: str, output_name: str
     copied = drive_service.files().copy(
         fileId=template_id,
         body={"name": output_name},
-        supportsAllDrives=True
-    ).execute()
+        supportsAllDrives=True,
+        fields="id"
+    ).execute(num_retries=API_NUM_RETRIES)
     
     presentation_id = copied["id"]
     print(f"✓ Presentation copied successfully: {presentation_id}")
     return presentation_id
 
 
-def replace_text_placeholders(slides_service, presentation_id: str, placeholders: Dict[str, str]):
+def delete_presentation(drive_service, presentation_id: str):
     """
-    Replace all text placeholders in the presentation.
+    Delete a copied presentation that will not be used.
     
     Args:
-        slides_service: Google Slides API service instance
-        presentation_id: ID of the presentation to update
-        placeholders: Dictionary of placeholder mappings
+        drive_service: Google Drive API service instance
+        presentation_id: ID of the presentation to delete
     """
-    print("Replacing text placeholders...")
-    requests = []
-    for key, value in placeholders.items():
-        requests.append({
-            "replaceAllText": {
-                "containsText": {"text": key, "matchCase": True},
-                "replaceText": value
-            }
-        })
-    
-    slides_service.presentations().batchUpdate(
-        presentationId=presentation_id,
-        body={"requests": requests}
-    ).execute()
-    print(f"✓ Replaced {len(placeholders)} text placeholders")
+    drive_service.files().delete(
+        fileId=presentation_id,
+        supportsAllDrives=True
+    ).execute(num_retries=API_NUM_RETRIES)
+    print(f"✓ Deleted unused presentation copy: {presentation_id}")
+
 
+def _find_placeholders(node) -> Set[str]:
+    """
+    Collect {{KEY}} tokens from every text body (shapes, table cells, notes)
+    in a Slides API resource, joining text runs so a placeholder split across
+    styled runs is still found.
+    """
+    tokens = set()
+    if isinstance(node, dict):
+        if "textElements" in node:
+            text = "".join(
+                element.get("textRun", {}).get("content", "")
+                for element in node["textElements"]
+            )
+            tokens.update(PLACEHOLDER_PATTERN.findall(text))
+        for value in node.values():
+            tokens |= _find_placeholders(value)
+    elif isinstance(node, list):
+        for value in node:
+            tokens |= _find_placeholders(value)
+    return tokens
 
-def update_market_chart(slides_service, sheets_service, presentation_id: str, market_data: Dict[str, float]):
+
+def get_template_info(slides_service, drive_service, sheets_service, template_id: str) -> Dict[str, Any]:
     """
-    Update the market size chart with new data.
+    Scan a template for its placeholders and linked chart, reusing the last
+    scan until the template is edited.
+    
+    Object IDs are preserved when the template is copied, so the slide and
+    chart IDs found here are valid on every generated deck.
     
     Args:
         slides_service: Google Slides API service instance
+        drive_service: Google Drive API service instance
         sheets_service: Google Sheets API service instance
-        presentation_id: ID of the presentation
-        market_data: Dictionary with market size values
+        template_id: ID of the template presentation
+        
+    Returns:
+        Dictionary with the template's Drive 'version', 'placeholders'
+        ({{KEY}} token -> slide object IDs), 'chart_object_ids', 'sheet_id'
+        and 'chart_tab_name' (None when the template has no linked chart)
     """
-    print("Updating market chart data...")
+    # Drive bumps the version on every edit, so it tells whether a scan is stale
+    version = drive_service.files().get(
+        fileId=template_id,
+        supportsAllDrives=True,
+        fields="version"
+    ).execute(num_retries=API_NUM_RETRIES)["version"]
+    
+    cached = _TEMPLATE_INFO.get(template_id)
+    if cached and cached["version"] == version:
+        return cached
     
-    # Get presentation details to find linked charts
+    # Reuse the scan from a previous run when one is on disk
+    cache_file = os.path.join(CACHE_DIR, f"template_{template_id}.json")
+    try:
+        with open(cache_file, "r") as f:
+            cached = json.load(f)
+        if cached["version"] == version:
+            _TEMPLATE_INFO[template_id] = {key: cached[key] for key in TEMPLATE_INFO_KEYS}
+            return _TEMPLATE_INFO[template_id]
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    print(f"Scanning template presentation: {template_id}")
     presentation = slides_service.presentations().get(
-        presentationId=presentation_id
-    ).execute()
+        presentationId=template_id,
+        fields=TEMPLATE_SCAN_FIELDS
+    ).execute(num_retries=API_NUM_RETRIES)
+    
+    # Map each placeholder to the slides it appears on, so replacements only
+    # scan those pages; placeholders also used off-slide (speaker notes,
+    # layouts, masters) get an empty list, meaning "search everywhere"
+    placeholders: Dict[str, List[str]] = {}
+    off_slide = _find_placeholders({k: v for k, v in presentation.items() if k != "slides"})
+    
+    for slide in presentation.get("slides", []):
+        off_slide |= _find_placeholders({k: v for k, v in slide.items() if k != "pageElements"})
+        for token in _find_placeholders(slide.get("pageElements", [])):
+            placeholders.setdefault(token, []).append(slide["objectId"])
+    
+    for token in off_slide:
+        placeholders[token] = []
     
     chart_object_ids = []
-    linked_sheet_ids = set()
+    linked_sheet_ids = []
     
     # Find all linked Sheets charts
     for slide in presentation.get("slides", []):
         for element in slide.get("pageElements", []):
             if "sheetsChart" in element:
                 chart_object_ids.append(element["objectId"])
-                linked_sheet_ids.add(element["sheetsChart"]["spreadsheetId"])
+                spreadsheet_id = element["sheetsChart"]["spreadsheetId"]
+                if spreadsheet_id not in linked_sheet_ids:
+                    linked_sheet_ids.append(spreadsheet_id)
     
-    if not linked_sheet_ids:
-        print("⚠ Warning: No linked Sheets charts found in presentation")
-        return
+    sheet_id = None
+    chart_tab_name = None
     
-    # Use the first linked sheet
-    sheet_id = list(linked_sheet_ids)[0]
-    print(f"Found linked sheet: {sheet_id}")
+    if linked_sheet_ids:
+        # Use the first linked sheet
+        sheet_id = linked_sheet_ids[0]
+        print(f"Found linked sheet: {sheet_id}")
+        
+        # Get sheet metadata to find chart tab
+        sheet_meta = sheets_service.spreadsheets().get(
+            spreadsheetId=sheet_id,
+            fields="sheets/properties/title"
+        ).execute(num_retries=API_NUM_RETRIES)
+        
+        for sheet in sheet_meta["sheets"]:
+            title = sheet["properties"]["title"]
+            if title.startswith("[Chart"):
+                chart_tab_name = title
+                break
+        
+        # Fallback to first sheet if no chart tab found
+        if not chart_tab_name:
+            chart_tab_name = sheet_meta["sheets"][0]["properties"]["title"]
+        
+        print(f"Using chart tab: {chart_tab_name}")
+    
+    info = {
+        "version": version,
+        "placeholders": placeholders,
+        "chart_object_ids": chart_object_ids,
+        "sheet_id": sheet_id,
+        "chart_tab_name": chart_tab_name
+    }
+    _TEMPLATE_INFO[template_id] = info
     
-    # Get sheet metadata to find chart tab
-    sheet_meta = sheets_service.spreadsheets().get(spreadsheetId=sheet_id).execute()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(cache_file, "w") as f:
+        json.dump(info, f)
     
-    chart_tab_name = None
-    for sheet in sheet_meta["sheets"]:
-        title = sheet["properties"]["title"]
-        if title.startswith("[Chart"):
-            chart_tab_name = title
-            break
+    return info
+
+
+def build_text_requests(
+    placeholders: Dict[str, str],
+    template_placeholders: Optional[Dict[str, List[str]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Build the Slides requests that replace all text placeholders.
+    
+    Args:
+        placeholders: Dictionary of placeholder mappings
+        template_placeholders: Placeholders present in the template, mapped to the
+            slides they appear on; others are skipped
+        
+    Returns:
+        List of replaceAllText requests
+    """
+    # Replacing a token with itself is a no-op the server would still scan every slide for
+    placeholders = {k: v for k, v in placeholders.items() if v != k}
+    if template_placeholders is not None:
+        placeholders = {k: v for k, v in placeholders.items() if k in template_placeholders}
+    
+    if not placeholders:
+        print("⚠ Warning: No matching placeholders found in presentation")
+    
+    requests = []
+    for key, value in placeholders.items():
+        request = {
+            "containsText": {"text": key, "matchCase": True},
+            "replaceText": value
+        }
+        # Restrict the server-side search to the slides that use this placeholder
+        page_ids = template_placeholders.get(key) if template_placeholders else None
+        if page_ids:
+            request["pageObjectIds"] = page_ids
+        requests.append({"replaceAllText": request})
+    
+    return requests
+
+
+def update_market_chart(sheets_service, market_data: Dict[str, float], template_info: Dict[str, Any]):
+    """
+    Write new market size data to the sheet behind the template's chart.
+    
+    Args:
+        sheets_service: Google Sheets API service instance
+        market_data: Dictionary with market size values
+        template_info: Template scan from get_template_info()
+    """
+    print("Updating market chart data...")
     
-    # Fallback to first sheet if no chart tab found
-    if not chart_tab_name:
-        chart_tab_name = sheet_meta["sheets"][0]["properties"]["title"]
+    sheet_id = template_info["sheet_id"]
+    chart_tab_name = template_info["chart_tab_name"]
     
-    print(f"Using chart tab: {chart_tab_name}")
+    if not sheet_id:
+        print("⚠ Warning: No linked Sheets charts found in presentation")
+        return
     
     # Convert billions to millions for chart (format divides by 1000)
     # TAM/SAM are in billions, SOM is in billions too (0.5 = 500M)
@@ -247,24 +584,53 @@ def update_market_chart(slides_service, sheets_service, presentation_id: str, ma
         range=f"'{chart_tab_name}'!A1:B4",
         valueInputOption="RAW",
         body={"values": sheet_values}
-    ).execute()
+    ).execute(num_retries=API_NUM_RETRIES)
     print("✓ Market data updated in sheet")
+
+
+def build_chart_refresh_requests(template_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Build the Slides requests that refresh the linked charts so they pick up
+    the updated sheet data.
     
-    # Refresh charts in presentation
-    if chart_object_ids:
-        refresh_requests = [
-            {"refreshSheetsChart": {"objectId": chart_id}}
-            for chart_id in chart_object_ids
-        ]
-        
-        slides_service.presentations().batchUpdate(
-            presentationId=presentation_id,
-            body={"requests": refresh_requests}
-        ).execute()
-        print(f"✓ Refreshed {len(chart_object_ids)} chart(s)")
+    Args:
+        template_info: Template scan from get_template_info()
         
-        # Allow time for charts to refresh
-        time.sleep(2)
+    Returns:
+        List of refreshSheetsChart requests
+    """
+    return [
+        {"refreshSheetsChart": {"objectId": chart_id}}
+        for chart_id in template_info["chart_object_ids"]
+    ]
+
+
+def apply_slide_requests(slides_service, presentation_id: str, requests: List[Dict[str, Any]]):
+    """
+    Apply text replacements and chart refreshes in a single batchUpdate.
+    
+    The batchUpdate only returns once refreshed chart images are in the
+    presentation, so the deck can be exported straight away.
+    
+    Args:
+        slides_service: Google Slides API service instance
+        presentation_id: ID of the presentation to update
+        requests: Slides API requests to apply, in order
+    """
+    if not requests:
+        return
+    
+    print("Updating presentation...")
+    slides_service.presentations().batchUpdate(
+        presentationId=presentation_id,
+        body={"requests": requests}
+    ).execute(num_retries=API_NUM_RETRIES)
+    
+    text_count = sum("replaceAllText" in request for request in requests)
+    chart_count = len(requests) - text_count
+    print(f"✓ Replaced {text_count} text placeholders")
+    if chart_count:
+        print(f"✓ Refreshed {chart_count} chart(s)")
 
 
 def export_presentation(drive_service, presentation_id: str, output_file: str):
@@ -276,19 +642,97 @@ def export_presentation(drive_service, presentation_id: str, output_file: str):
         presentation_id: ID of the presentation to export
         output_file: Path to save the exported file
     """
+    from googleapiclient.http import MediaIoBaseDownload
+    
     print(f"Exporting presentation to {output_file}...")
     request = drive_service.files().export_media(
         fileId=presentation_id,
         mimeType="application/vnd.openxmlformats-officedocument.presentationml.presentation"
     )
     
+    # Stream to disk in chunks rather than buffering the whole file in memory
     with open(output_file, "wb") as f:
-        f.write(request.execute())
+        downloader = MediaIoBaseDownload(f, request, chunksize=EXPORT_CHUNK_SIZE)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk(num_retries=API_NUM_RETRIES)
     
     print(f"✓ Presentation exported successfully: {output_file}")
 
 
-def generate_pitch_deck(idea: str, context: Dict[str, str]) -> str:
+async def _discard_copy(copy_task: Awaitable[str]):
+    """
+    Wait for a template copy whose run has failed and delete it from Drive.
+    
+    Cancelling the task alone would not stop the worker thread's files().copy,
+    so the copy would be left behind in the user's Drive.
+    """
+    (presentation_id,) = await asyncio.gather(copy_task, return_exceptions=True)
+    if not isinstance(presentation_id, str):
+        return
+    
+    try:
+        _, drive_service, _ = await asyncio.to_thread(authenticate_google_services)
+        await asyncio.to_thread(delete_presentation, drive_service, presentation_id)
+    except Exception as e:
+        print(f"⚠ Warning: Could not delete unused presentation copy {presentation_id}: {e}")
+
+
+async def fill_and_export(
+    presentation: Awaitable[str],
+    template_info: Dict[str, Any],
+    placeholders: Dict[str, str],
+    market_data: Dict[str, float],
+    output_file: str
+):
+    """
+    Fill a copied presentation with content and export it as PPTX.
+    
+    Args:
+        presentation: Awaitable resolving to the ID of the copied presentation
+            (typically the still-running template copy)
+        template_info: Template scan from get_template_info()
+        placeholders: Dictionary mapping {{KEY}} to value
+        market_data: Dictionary with market size values
+        output_file: Path to save the exported file
+    """
+    # Authenticate with Google services (cached after the first call)
+    slides_service, drive_service, sheets_service = await asyncio.to_thread(authenticate_google_services)
+    
+    async def fill() -> str:
+        # The chart refresh needs the new sheet data, so write it first; the sheet
+        # belongs to the template rather than the copy, so the write overlaps the
+        # copy. Text replacement and chart refresh then share one Slides batchUpdate
+        presentation_id, _ = await asyncio.gather(
+            presentation,
+            asyncio.to_thread(update_market_chart, sheets_service, market_data, template_info)
+        )
+        slide_requests = (
+            build_text_requests(placeholders, template_info["placeholders"])
+            + build_chart_refresh_requests(template_info)
+        )
+        await asyncio.to_thread(apply_slide_requests, slides_service, presentation_id, slide_requests)
+        return presentation_id
+    
+    # Hold the sheet from the data write until the chart refresh has returned;
+    # if any step fails, the half-filled copy is deleted
+    presentation = asyncio.ensure_future(presentation)
+    sheet_id = template_info["sheet_id"]
+    try:
+        if sheet_id:
+            async with _SHEET_LOCKS.setdefault(sheet_id, asyncio.Lock()):
+                presentation_id = await fill()
+        else:
+            presentation_id = await fill()
+    except BaseException:
+        await _discard_copy(presentation)
+        raise
+    
+    # Export final presentation
+    await asyncio.to_thread(export_presentation, drive_service, presentation_id, output_file)
+
+
+async def generate_pitch_deck(idea: str, context: Dict[str, str]) -> str:
     """
     Orchestrates the pitch deck generation process.
     
@@ -301,50 +745,126 @@ def generate_pitch_deck(idea: str, context: Dict[str, str]) -> str:
     """
     print(f"\n🤖 Generating pitch deck for: {idea}")
     
-    # 1. Generate Content with AI
-    print("   Generating structured metadata...")
-    generated_content = generate_pitch_metadata(idea, context)
-    
-    print("   Generating market data...")
-    market_data = generate_market_data(idea, context)
-    
     # Load configuration from environment
     template_id = get_env_variable("TEMPLATE_PRESENTATION_ID")
-    output_name = f"Pitch Deck - {generated_content.get('COMPANY_NAME', 'Startup')}"
-    output_filename = f"pitch_deck_{int(time.time())}.pptx"
+    output_filename = f"pitch_deck_{time.time_ns()}.pptx"
     output_file = os.path.join(os.getcwd(), output_filename)
     
-    # Authenticate with Google services
-    slides_service, drive_service, sheets_service = authenticate_google_services()
+    # The company name is the first field the LLM streams back; resolve it
+    # early so the template copy can start while the rest is still decoding
+    company_name = asyncio.get_running_loop().create_future()
+    
+    def on_field(key: str, value: str):
+        if key == "COMPANY_NAME" and not company_name.done():
+            company_name.set_result(value)
+    
+    async def generate_content():
+        generated_content, market_data = await generate_all(idea, context, on_field)
+        # The generator falls back to {} on API or schema errors; a deck full of
+        # unreplaced {{KEY}} tokens is a failure, not a result
+        if not generated_content:
+            raise RuntimeError("Failed to generate pitch deck content")
+        if not company_name.done():
+            company_name.set_result(None)
+        return generated_content, market_data
+    
+    async def create_presentation():
+        name = await company_name
+        # Blocking Google API calls run in worker threads to keep the event loop free
+        _, drive_service, _ = await asyncio.to_thread(authenticate_google_services)
+        return await asyncio.to_thread(
+            copy_template_presentation, drive_service, template_id,
+            f"Pitch Deck - {name or 'Startup'}"
+        )
+    
+    async def scan_template():
+        # Template structure is only rescanned after the template is edited
+        slides_service, drive_service, sheets_service = await asyncio.to_thread(authenticate_google_services)
+        return await asyncio.to_thread(
+            get_template_info, slides_service, drive_service, sheets_service, template_id
+        )
+    
+    # 1. Generate Content with AI (metadata and market data share one request),
+    #    alongside the independent template copy and template scan; the copy is
+    #    only needed once the slides are filled, so it is not awaited here
+    print("   Generating structured metadata and market data...")
+    copy_task = asyncio.create_task(create_presentation())
+    try:
+        (generated_content, market_data), template_info = await asyncio.gather(
+            generate_content(),
+            scan_template()
+        )
+    except BaseException:
+        # Keep the copy from starting if the company name has not arrived yet
+        company_name.cancel()
+        await _discard_copy(copy_task)
+        raise
     
     # Prepare placeholders
     placeholders = prepare_placeholders(generated_content)
     
-    # Create presentation
-    presentation_id = copy_template_presentation(drive_service, template_id, output_name)
+    await fill_and_export(copy_task, template_info, placeholders, market_data, output_file)
+    
+    return output_file
+
+
+async def generate_pitch_deck_from_env() -> str:
+    """
+    Generates the pitch deck from content configured in environment variables
+    (see .env.example) instead of the LLM.
     
-    # Update content
-    replace_text_placeholders(slides_service, presentation_id, placeholders)
-    update_market_chart(slides_service, sheets_service, presentation_id, market_data)
+    Returns:
+        Path to the generated PPTX file
+    """
+    print("\n📄 Generating pitch deck from environment configuration")
     
-    # Export final presentation
-    export_presentation(drive_service, presentation_id, output_file)
+    # Load configuration from environment; fails fast on any missing value
+    template_id = get_env_variable("TEMPLATE_PRESENTATION_ID")
+    placeholders = load_placeholders()
+    market_data = load_market_data()
+    output_name = get_env_variable("OUTPUT_PRESENTATION_NAME", "Generated Pitch Deck")
+    output_file = os.path.join(
+        os.getcwd(), get_env_variable("OUTPUT_FILE_NAME", "output_pitch_deck.pptx")
+    )
+    
+    # Authenticate with Google services
+    slides_service, drive_service, sheets_service = await asyncio.to_thread(authenticate_google_services)
+    
+    # The template copy and template scan are independent; the chart data can
+    # be written as soon as the scan is done, while the copy is still running
+    copy_task = asyncio.create_task(
+        asyncio.to_thread(copy_template_presentation, drive_service, template_id, output_name)
+    )
+    try:
+        template_info = await asyncio.to_thread(
+            get_template_info, slides_service, drive_service, sheets_service, template_id
+        )
+    except BaseException:
+        await _discard_copy(copy_task)
+        raise
+    
+    await fill_and_export(copy_task, template_info, placeholders, market_data, output_file)
     
     return output_file
 
 
-def main():
+def main(argv=None):
     """Main execution function."""
+    args = parse_args(argv)
+    
     try:
         print("=" * 60)
         print("PitchForge AI - Pitch Deck Generator")
         print("=" * 60)
         
-        # 1. Get User Input
-        user_data = get_user_input()
-        
-        # 2. Generate Deck
-        output_file = generate_pitch_deck(user_data["idea"], user_data["context"])
+        if args.mode == "env":
+            output_file = asyncio.run(generate_pitch_deck_from_env())
+        else:
+            # 1. Get User Input
+            user_data = get_user_input(args)
+            
+            # 2. Generate Deck
+            output_file = asyncio.run(generate_pitch_deck(user_data["idea"], user_data["context"]))
         
         print("=" * 60)
         print("✓ DONE! Your pitch deck is ready.")
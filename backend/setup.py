@@ -5,6 +5,7 @@ Helps users configure their environment variables interactively.
 """
 
 import os
+import re
 import sys
 
 
@@ -70,14 +71,14 @@ def create_env_file():
     with open(".env.example", "r") as f:
         content = f.read()
     
-    # Replace required fields
+    # Replace required fields (callable replacement so backslashes in values stay literal)
     for key, value in env_values.items():
-        # Find and replace the line
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            if line.startswith(f"{key}="):
-                lines[i] = f"{key}={value}"
-        content = '\n'.join(lines)
+        content = re.sub(
+            rf"(?m)^{re.escape(key)}=.*$",
+            lambda _: f"{key}={value}",
+            content,
+            count=1
+        )
     
     # Write .env file
     with open(".env", "w") as f:
@@ -89,7 +90,7 @@ def create_env_file():
     print("Next steps:")
     print("1. Edit .env to customize all fields for your pitch deck")
     print("2. Ensure oauth_credentials.json is in the project root")
-    print("3. Run: python generate_ppt.py")
+    print("3. Run: python generate_ppt.py --mode env")
     print("=" * 60)
 
 